@@ -1,8 +1,35 @@
-import requests
-import vertexai
-from vertexai.generative_models import GenerativeModel
+import sys
+import logging
+import threading
+import httpx
+import orjson
+from pathlib import Path
+from cachetools import TTLCache
 from typing import Dict, Any, Optional, List, Tuple
 
+# The shared helpers live at the repo root, one level above the
+# per-challenge folders the notebooks run from.
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from common.http_client import SESSION as _SESSION  # noqa: E402
+from common.vertex_clients import (  # noqa: E402
+    YES_NO_CONFIG as _YES_NO_CONFIG,
+    get_moderation_model as _get_moderation_model,
+)
+
+logger = logging.getLogger(__name__)
+
+# Geocoding results for a given address are stable, so repeated lookups
+# can be served from memory for a day instead of re-hitting the API.
+_GEOCODE_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=86400)
+_GEOCODE_CACHE_LOCK = threading.RLock()
+
+# The NWS points endpoint maps coordinates to a grid forecast URL, which
+# is effectively static per location. Caching it for a week (keyed on
+# coordinates rounded to ~1 km) halves the requests for repeat lookups.
+_FORECAST_URL_CACHE: TTLCache = TTLCache(maxsize=10000, ttl=604800)
+_FORECAST_URL_CACHE_LOCK = threading.RLock()
+
 
 def get_lat_lon_from_address(
     address: str, api_key: str
@@ -20,32 +47,40 @@ def get_lat_lon_from_address(
         A tuple containing the latitude and longitude (lat, lon), or None if
         the address could not be geocoded.
     """
+    cache_key = (address.strip().lower(), api_key)
+    with _GEOCODE_CACHE_LOCK:
+        if cache_key in _GEOCODE_CACHE:
+            return _GEOCODE_CACHE[cache_key]
+
     base_url = "https://maps.googleapis.com/maps/api/geocode/json"
     params = {
         'address': address,
         'key': api_key
     }
     try:
-        response = requests.get(base_url, params=params, timeout=10)
+        response = _SESSION.get(base_url, params=params, timeout=10)
         response.raise_for_status()
 
-        data = response.json()
+        data = orjson.loads(response.content)
 
         if data['status'] == 'OK':
             location = data['results'][0]['geometry']['location']
-            return (location['lat'], location['lng'])
+            coords = (location['lat'], location['lng'])
+            with _GEOCODE_CACHE_LOCK:
+                _GEOCODE_CACHE[cache_key] = coords
+            return coords
         else:
             error_message = data.get('error_message', '')
-            print(
+            logger.warning(
                 f"Geocoding API Error: {data.get('status')} - {error_message}"
             )
             return None
 
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred with the network request: {e}")
+    except httpx.HTTPError as e:
+        logger.warning(f"An error occurred with the network request: {e}")
         return None
-    except (KeyError, IndexError) as e:
-        print(f"Error parsing the Geocoding API response: {e}")
+    except (KeyError, IndexError, ValueError) as e:
+        logger.warning(f"Error parsing the Geocoding API response: {e}")
         return None
 
 
@@ -67,38 +102,45 @@ def get_weather_forecast(
         period (e.g., 'Tonight', 'Thursday'). Returns None if an error
         occurs or the data cannot be fetched.
     """
-    headers = {
-        'User-Agent': 'MyWeatherApp/1.0 (contact@example.com)'
-    }
-    points_url = f"https://api.weather.gov/points/{latitude},{longitude}"
+    cache_key = (round(latitude, 2), round(longitude, 2))
 
     try:
-        points_response = requests.get(points_url, headers=headers, timeout=10)
-        points_response.raise_for_status()
-        points_data = points_response.json()
-        forecast_url = points_data.get('properties', {}).get('forecast')
+        with _FORECAST_URL_CACHE_LOCK:
+            forecast_url = _FORECAST_URL_CACHE.get(cache_key)
 
         if not forecast_url:
-            print("Error: Could not find forecast URL in the API response.")
-            return None
+            points_url = (
+                f"https://api.weather.gov/points/{latitude},{longitude}"
+            )
+            points_response = _SESSION.get(points_url, timeout=10)
+            points_response.raise_for_status()
+            points_data = orjson.loads(points_response.content)
+            forecast_url = points_data.get('properties', {}).get('forecast')
 
-        forecast_response = requests.get(
-            forecast_url, headers=headers, timeout=10
-        )
+            if not forecast_url:
+                logger.warning(
+                    "Error: Could not find forecast URL in the API response."
+                )
+                return None
+
+            with _FORECAST_URL_CACHE_LOCK:
+                _FORECAST_URL_CACHE[cache_key] = forecast_url
+
+        forecast_response = _SESSION.get(forecast_url, timeout=10)
         forecast_response.raise_for_status()
-        forecast_data = forecast_response.json()
+        forecast_data = orjson.loads(forecast_response.content)
 
         periods = forecast_data.get('properties', {}).get('periods')
         return periods
 
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred with the network request: {e}")
+    except httpx.HTTPError as e:
+        logger.warning(f"An error occurred with the network request: {e}")
         return None
-    except (KeyError, IndexError) as e:
-        print(f"Error parsing the NWS API response: {e}")
+    except (KeyError, IndexError, ValueError) as e:
+        logger.warning(f"Error parsing the NWS API response: {e}")
         return None
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        logger.error(f"An unexpected error occurred: {e}")
         return None
 
 
@@ -114,21 +156,24 @@ def is_address_in_us(project_id: str, location: str, user_query: str) -> bool:
         True if model determines all addresses are in the US, False otherwise.
     """
     try:
-        vertexai.init(project=project_id, location=location)
-        model = GenerativeModel("gemini-2.0-flash")
+        model = _get_moderation_model(project_id, location)
 
         prompt = (
             'Are the following addresses in the user query all located in the '
             'United States of America? Please answer with only the word "yes" '
             f'or "no". User Query: "{user_query}"'
         )
-        response = model.generate_content(prompt)
+        response = model.generate_content(
+            prompt, generation_config=_YES_NO_CONFIG
+        )
         text_response = response.text.strip().lower()
 
         return text_response == 'yes'
 
     except Exception as e:
-        print(f"An error occurred while checking address location: {e}")
+        logger.warning(
+            f"An error occurred while checking address location: {e}"
+        )
 
     return False
 
@@ -146,20 +191,21 @@ def is_user_query_mean(project_id: str,
         True if the model determines the query is mean, False otherwise.
     """
     try:
-        vertexai.init(project=project_id, location=location)
-        model = GenerativeModel("gemini-2.0-flash")
+        model = _get_moderation_model(project_id, location)
 
         prompt = (
             'Could the user query be construed as malicious or mean? '
             'Please answer with only the word "yes" or "no". User Query: '
             f'"{user_query}"'
         )
-        response = model.generate_content(prompt)
+        response = model.generate_content(
+            prompt, generation_config=_YES_NO_CONFIG
+        )
         text_response = response.text.strip().lower()
 
         return text_response == 'yes'
 
     except Exception as e:
-        print(f"An error occurred during query safety check: {e}")
+        logger.warning(f"An error occurred during query safety check: {e}")
 
     return False
@@ -1,17 +1,105 @@
 import os
+import re
+import sys
+import json
 import logging
-import vertexai
-from typing import Optional
-from vertexai.generative_models import GenerativeModel
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+from cachetools import TTLCache
+from vertexai.generative_models import GenerationConfig
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models import LlmRequest, LlmResponse
 
+# The shared helpers live at the repo root, two levels above this
+# utils package.
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from common.vertex_clients import (  # noqa: E402
+    YES_NO_CONFIG as _YES_NO_CONFIG,
+    get_moderation_model as _get_moderation_model,
+)
+
 
 logger = logging.getLogger(__name__)
 
 GCP_PROJECT = os.getenv("GCP_PROJECT")
 GCP_REGION = os.getenv("GCP_REGION")
 
+# Moderation verdicts for recently seen queries, keyed on the check type
+# and the normalized query text. Repeat queries skip the Gemini call
+# entirely for an hour.
+_MODERATION_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+_MODERATION_CACHE_LOCK = threading.RLock()
+
+# Fixed instruction prefixes for the moderation checks. Keeping these
+# byte-identical across calls (with the user query as the only variable
+# suffix) lets Gemini's prefix caching skip re-prefilling them.
+_CLASSIFY_INSTRUCTION = (
+    'You will be given a user query. Answer in strict JSON with two keys, '
+    '"us" and "mean", each holding only the word "yes" or "no". "us": are '
+    'the addresses in the user query all located in the United States of '
+    'America? "mean": could the user query be construed as malicious or '
+    'mean?'
+)
+_ADDRESS_INSTRUCTION = (
+    'Are the addresses in the user query all located in the United States '
+    'of America? Please answer with only the word "yes" or "no".'
+)
+_MEAN_INSTRUCTION = (
+    'Could the user query be construed as malicious or mean? Please answer '
+    'with only the word "yes" or "no".'
+)
+
+# Deterministic pre-filters that settle clear-cut queries locally, so
+# only ambiguous text pays for a Gemini round-trip.
+_WORD_RE = re.compile(r"\w+")
+_STATE_ZIP_RE = re.compile(r"\b([A-Z]{2})\s+(\d{5})(?:-\d{4})?\b")
+_US_STATES = frozenset(
+    'AL AK AZ AR CA CO CT DE FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN '
+    'MS MO MT NE NV NH NJ NM NY NC ND OH OK OR PA RI SC SD TN TX UT VT VA '
+    'WA WV WI WY DC'.split()
+)
+_PROFANITY = frozenset(
+    'stupid idiot idiots dumb moron morons jerk jerks loser losers hate '
+    'ugly suck sucks'.split()
+)
+
+
+def _query_mean_local(user_text: str) -> Optional[bool]:
+    """Fast deterministic meanness check.
+
+    The wordlist only covers blatant insults, so a miss is not evidence
+    the query is benign — it just means the model has to judge it.
+
+    Args:
+        user_text: The user's query string.
+
+    Returns:
+        True on an obvious profanity hit, None otherwise.
+    """
+    tokens = set(_WORD_RE.findall(user_text.lower()))
+    if tokens & _PROFANITY:
+        return True
+    return None
+
+
+def _address_in_us_local(user_text: str) -> Optional[bool]:
+    """Fast deterministic US-address check.
+
+    Args:
+        user_text: The user's query string.
+
+    Returns:
+        True when the text contains state-plus-ZIP patterns that all name
+        valid US states, and None when no such pattern appears or an
+        abbreviation is unknown, leaving the verdict to the model.
+    """
+    matches = _STATE_ZIP_RE.findall(user_text)
+    if matches and all(state in _US_STATES for state, _ in matches):
+        return True
+    return None
+
 
 def is_address_in_us(project_id: str, location: str, user_query: str) -> bool:
     """Checks if the addresses in a user query are in the United States.
@@ -24,22 +112,34 @@ def is_address_in_us(project_id: str, location: str, user_query: str) -> bool:
     Returns:
         True if model determines all addresses are in the US, False otherwise.
     """
+    cache_key = ('address_in_us', user_query.strip().lower())
+    with _MODERATION_CACHE_LOCK:
+        if cache_key in _MODERATION_CACHE:
+            return _MODERATION_CACHE[cache_key]
+
+    local_verdict = _address_in_us_local(user_query)
+    if local_verdict is not None:
+        return local_verdict
+
     try:
-        vertexai.init(project=project_id, location=location)
-        model = GenerativeModel("gemini-2.5-flash")
+        model = _get_moderation_model(
+            project_id, location, system_instruction=_ADDRESS_INSTRUCTION
+        )
 
-        prompt = (
-            'Are the following addresses in the user query all located in the '
-            'United States of America? Please answer with only the word "yes" '
-            f'or "no". User Query: "{user_query}"'
+        response = model.generate_content(
+            f'User Query: "{user_query}"', generation_config=_YES_NO_CONFIG
         )
-        response = model.generate_content(prompt)
         text_response = response.text.strip().lower()
 
-        return text_response == 'yes'
+        verdict = text_response == 'yes'
+        with _MODERATION_CACHE_LOCK:
+            _MODERATION_CACHE[cache_key] = verdict
+        return verdict
 
     except Exception as e:
-        print(f"An error occurred while checking address location: {e}")
+        logger.warning(
+            f"An error occurred while checking address location: {e}"
+        )
 
     return False
 
@@ -56,43 +156,192 @@ def is_user_query_mean(project_id: str,
     Returns:
         True if the model determines the query is mean, False otherwise.
     """
+    cache_key = ('query_mean', user_query.strip().lower())
+    with _MODERATION_CACHE_LOCK:
+        if cache_key in _MODERATION_CACHE:
+            return _MODERATION_CACHE[cache_key]
+
+    local_verdict = _query_mean_local(user_query)
+    if local_verdict is not None:
+        return local_verdict
+
     try:
-        vertexai.init(project=project_id, location=location)
-        model = GenerativeModel("gemini-2.5-flash")
+        model = _get_moderation_model(
+            project_id, location, system_instruction=_MEAN_INSTRUCTION
+        )
 
-        prompt = (
-            'Could the user query be construed as malicious or mean? '
-            'Please answer with only the word "yes" or "no". User Query: '
-            f'"{user_query}"'
+        response = model.generate_content(
+            f'User Query: "{user_query}"', generation_config=_YES_NO_CONFIG
         )
-        response = model.generate_content(prompt)
         text_response = response.text.strip().lower()
 
-        return text_response == 'yes'
+        verdict = text_response == 'yes'
+        with _MODERATION_CACHE_LOCK:
+            _MODERATION_CACHE[cache_key] = verdict
+        return verdict
 
     except Exception as e:
-        print(f"An error occurred during query safety check: {e}")
+        logger.warning(f"An error occurred during query safety check: {e}")
 
     return False
 
 
+def classify_query(
+    project_id: str, location: str, user_query: str
+) -> Tuple[bool, bool]:
+    """Runs both moderation checks with a single Gemini call.
+
+    Combines the US-address and meanness checks into one JSON-mode
+    prompt, halving the LLM round-trips and token cost per user message
+    compared to calling is_address_in_us and is_user_query_mean
+    separately.
+
+    Args:
+        project_id: The Google Cloud project ID.
+        location: The Google Cloud location (e.g., "us-central1").
+        user_query: The user's query string.
+
+    Returns:
+        A tuple (address_in_us, query_mean). On error, returns
+        (False, False), matching the fail-closed behavior of the
+        individual checks.
+    """
+    cache_key = ('classify', user_query.strip().lower())
+    with _MODERATION_CACHE_LOCK:
+        if cache_key in _MODERATION_CACHE:
+            return _MODERATION_CACHE[cache_key]
+
+    local_us = _address_in_us_local(user_query)
+    local_mean = _query_mean_local(user_query)
+    if local_us is not None and local_mean is not None:
+        return (local_us, local_mean)
+
+    try:
+        model = _get_moderation_model(
+            project_id, location, system_instruction=_CLASSIFY_INSTRUCTION
+        )
+
+        response = model.generate_content(
+            f'User Query: "{user_query}"',
+            generation_config=GenerationConfig(
+                response_mime_type="application/json",
+                temperature=0,
+                max_output_tokens=16,
+            ),
+        )
+        data = json.loads(response.text)
+
+        verdict = (
+            str(data.get('us', '')).strip().lower() == 'yes',
+            str(data.get('mean', '')).strip().lower() == 'yes',
+        )
+        with _MODERATION_CACHE_LOCK:
+            _MODERATION_CACHE[cache_key] = verdict
+        return verdict
+
+    except Exception as e:
+        logger.warning(f"An error occurred while classifying the query: {e}")
+
+    return (False, False)
+
+
+async def classify_query_async(
+    project_id: str, location: str, user_query: str
+) -> Tuple[bool, bool]:
+    """Async variant of classify_query.
+
+    Awaiting the Gemini call instead of blocking lets the ADK runtime
+    schedule other agents while moderation is in flight.
+
+    Args:
+        project_id: The Google Cloud project ID.
+        location: The Google Cloud location (e.g., "us-central1").
+        user_query: The user's query string.
+
+    Returns:
+        A tuple (address_in_us, query_mean). On error, returns
+        (False, False), matching the fail-closed behavior of the
+        individual checks.
+    """
+    cache_key = ('classify', user_query.strip().lower())
+    with _MODERATION_CACHE_LOCK:
+        if cache_key in _MODERATION_CACHE:
+            return _MODERATION_CACHE[cache_key]
+
+    local_us = _address_in_us_local(user_query)
+    local_mean = _query_mean_local(user_query)
+    if local_us is not None and local_mean is not None:
+        return (local_us, local_mean)
+
+    try:
+        model = _get_moderation_model(
+            project_id, location, system_instruction=_CLASSIFY_INSTRUCTION
+        )
+
+        response = await model.generate_content_async(
+            f'User Query: "{user_query}"',
+            generation_config=GenerationConfig(
+                response_mime_type="application/json",
+                temperature=0,
+                max_output_tokens=16,
+            ),
+        )
+        data = json.loads(response.text)
+
+        verdict = (
+            str(data.get('us', '')).strip().lower() == 'yes',
+            str(data.get('mean', '')).strip().lower() == 'yes',
+        )
+        with _MODERATION_CACHE_LOCK:
+            _MODERATION_CACHE[cache_key] = verdict
+        return verdict
+
+    except Exception as e:
+        logger.warning(f"An error occurred while classifying the query: {e}")
+
+    return (False, False)
+
+
+def _latest_user_text(llm_request: LlmRequest) -> Optional[str]:
+    """Extracts the stripped text of the latest user turn, if any.
+
+    Args:
+        llm_request: The request object sent to the LLM.
+
+    Returns:
+        The stripped user text, or None when the latest content is not a
+        user text turn.
+    """
+    if not llm_request.contents:
+        return None
+
+    last = llm_request.contents[-1]
+    if last.role == "user" and last.parts and last.parts[0].text:
+        return last.parts[0].text.strip()
+
+    return None
+
+
 def user_prompt_log_callback(
-    callback_context: CallbackContext, llm_request: LlmRequest
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+    user_text: Optional[str] = None,
 ) -> Optional[LlmResponse]:
     """Logs the content of the user's latest prompt.
 
     Args:
         callback_context: The context of the agent executing the callback.
         llm_request: The request object sent to the LLM.
+        user_text: The already-extracted user text, to avoid re-parsing
+            the request when a chained caller has it on hand.
 
     Returns:
         LlmResponse or None.
     """
-    if llm_request.contents:
-        last = llm_request.contents[-1]
-        if last.role == "user" and last.parts and last.parts[0].text:
-            user_text = last.parts[0].text.strip()
-            logger.info(f"[{callback_context.agent_name}] USER >> {user_text}")
+    if user_text is None:
+        user_text = _latest_user_text(llm_request)
+    if user_text:
+        logger.info(f"[{callback_context.agent_name}] USER >> {user_text}")
 
     return None
 
@@ -117,32 +366,39 @@ def model_response_log_callback(
             )
 
 
-def user_query_check_callback(
-    callback_context: CallbackContext, llm_request: LlmRequest
+async def user_query_check_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+    user_text: Optional[str] = None,
 ) -> Optional[LlmResponse]:
     """Performs moderation checks on the user's query.
 
     Checks for non-US addresses and harmful content. If a check fails,
-    it returns a pre-canned LlmResponse to stop further processing.
+    it returns a pre-canned LlmResponse to stop further processing. The
+    callback is async so the moderation call does not block the agent
+    runtime's event loop.
 
     Args:
         callback_context: The context of the agent executing the callback.
         llm_request: The request object containing the user's query.
+        user_text: The already-extracted user text, to avoid re-parsing
+            the request when a chained caller has it on hand.
 
     Returns:
         An LlmResponse to short-circuit the chain if moderation fails,
         otherwise None.
     """
     try:
-        last = llm_request.contents[-1]
+        if user_text is None:
+            user_text = _latest_user_text(llm_request)
 
-        if last.role == "user" and last.parts and last.parts[0].text:
-            user_text = last.parts[0].text.strip()
-            if not is_address_in_us(
+        if user_text:
+            address_in_us, query_mean = await classify_query_async(
                 project_id=GCP_PROJECT,
                 location=GCP_REGION,
                 user_query=user_text,
-            ):
+            )
+            if not address_in_us:
                 return LlmResponse(
                     content={
                         "role": "model",
@@ -155,11 +411,7 @@ def user_query_check_callback(
                     }
                 )
 
-            if is_user_query_mean(
-                project_id=GCP_PROJECT,
-                location=GCP_REGION,
-                user_query=user_text,
-            ):
+            if query_mean:
                 return LlmResponse(
                     content={"role": "model", "parts": [{"text": "Be nice."}]}
                 )
@@ -170,14 +422,15 @@ def user_query_check_callback(
     return None
 
 
-def chained_before_callback(
+async def chained_before_callback(
     callback_context: CallbackContext, llm_request: LlmRequest
 ) -> Optional[LlmResponse]:
     """A chained 'before' callback that runs multiple checks in sequence.
 
     It first runs a moderation check. If the moderation check returns a
     response, this function immediately returns it. Otherwise, it proceeds
-    to log the user's input.
+    to log the user's input. ADK awaits coroutine callbacks, so the async
+    moderation check runs without blocking the event loop.
 
     Args:
         callback_context: The context of the agent executing the callback.
@@ -187,14 +440,19 @@ def chained_before_callback(
         An LlmResponse if moderation fails, otherwise None.
     """
 
+    # Parse the latest user turn once and share it with both steps.
+    user_text = _latest_user_text(llm_request)
+
     # 1. Moderation check
-    moderation_result = user_query_check_callback(
-        callback_context, llm_request
+    moderation_result = await user_query_check_callback(
+        callback_context, llm_request, user_text=user_text
     )
     if moderation_result is not None:
         return moderation_result
 
     # 2. Log user input
-    user_prompt_log_callback(callback_context, llm_request)
+    user_prompt_log_callback(
+        callback_context, llm_request, user_text=user_text
+    )
 
     return None
@@ -1,9 +1,39 @@
 import os
-import requests
+import sys
+import logging
+import asyncio
+import threading
+import httpx
+import orjson
+from pathlib import Path
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List, Tuple
 
+# The shared helpers live at the repo root, two levels above this
+# utils package.
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from common.http_client import (  # noqa: E402
+    SESSION as _SESSION,
+    build_async_client as _build_async_client,
+)
+
+logger = logging.getLogger(__name__)
+
 GOOGLE_MAP_KEY = os.getenv("GOOGLE_MAP_KEY")
 
+# Geocoding results for a given address are stable, so repeated lookups
+# can be served from memory for a day instead of re-hitting the API.
+_GEOCODE_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=86400)
+_GEOCODE_CACHE_LOCK = threading.RLock()
+
+# The NWS points endpoint maps coordinates to a grid forecast URL, which
+# is effectively static per location. Caching it for a week (keyed on
+# coordinates rounded to ~1 km) halves the requests for repeat lookups.
+_FORECAST_URL_CACHE: TTLCache = TTLCache(maxsize=10000, ttl=604800)
+_FORECAST_URL_CACHE_LOCK = threading.RLock()
+
 
 def get_lat_lon_from_address(
     address: str, api_key: str
@@ -21,35 +51,75 @@ def get_lat_lon_from_address(
         A tuple containing the latitude and longitude (lat, lon), or None if
         the address could not be geocoded.
     """
+    cache_key = (address.strip().lower(), api_key)
+    with _GEOCODE_CACHE_LOCK:
+        if cache_key in _GEOCODE_CACHE:
+            return _GEOCODE_CACHE[cache_key]
+
     base_url = "https://maps.googleapis.com/maps/api/geocode/json"
     params = {
         'address': address,
         'key': api_key
     }
     try:
-        response = requests.get(base_url, params=params, timeout=10)
+        response = _SESSION.get(base_url, params=params, timeout=10)
         response.raise_for_status()
 
-        data = response.json()
+        data = orjson.loads(response.content)
 
         if data['status'] == 'OK':
             location = data['results'][0]['geometry']['location']
-            return (location['lat'], location['lng'])
+            coords = (location['lat'], location['lng'])
+            with _GEOCODE_CACHE_LOCK:
+                _GEOCODE_CACHE[cache_key] = coords
+            return coords
         else:
             error_message = data.get('error_message', '')
-            print(
+            logger.warning(
                 f"Geocoding API Error: {data.get('status')} - {error_message}"
             )
             return None
 
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred with the network request: {e}")
+    except httpx.HTTPError as e:
+        logger.warning(f"An error occurred with the network request: {e}")
         return None
-    except (KeyError, IndexError) as e:
-        print(f"Error parsing the Geocoding API response: {e}")
+    except (KeyError, IndexError, ValueError) as e:
+        logger.warning(f"Error parsing the Geocoding API response: {e}")
         return None
 
 
+def get_lat_lon_batch(
+    addresses: List[str], api_key: str
+) -> List[Optional[Tuple[float, float]]]:
+    """Geocodes several addresses concurrently.
+
+    The Geocoding API has no server-side batch endpoint, so the batch is
+    fanned out over a small thread pool on the shared pooled session;
+    the geocode cache still short-circuits repeated addresses.
+
+    Args:
+        addresses: Street addresses or place names to geocode.
+        api_key: Your Google Maps Platform API key.
+
+    Returns:
+        A list of (lat, lon) tuples in the same order as the input
+        addresses, with None entries for addresses that could not be
+        geocoded.
+    """
+    if not addresses:
+        return []
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(
+            executor.map(
+                lambda address: get_lat_lon_from_address(
+                    address=address, api_key=api_key
+                ),
+                addresses,
+            )
+        )
+
+
 def get_weather_forecast(
     latitude: float, longitude: float
 ) -> Optional[List[Dict[str, Any]]]:
@@ -68,38 +138,45 @@ def get_weather_forecast(
         period (e.g., 'Tonight', 'Thursday'). Returns None if an error
         occurs or the data cannot be fetched.
     """
-    headers = {
-        'User-Agent': 'MyWeatherApp/1.0 (contact@example.com)'
-    }
-    points_url = f"https://api.weather.gov/points/{latitude},{longitude}"
+    cache_key = (round(latitude, 2), round(longitude, 2))
 
     try:
-        points_response = requests.get(points_url, headers=headers, timeout=10)
-        points_response.raise_for_status()
-        points_data = points_response.json()
-        forecast_url = points_data.get('properties', {}).get('forecast')
+        with _FORECAST_URL_CACHE_LOCK:
+            forecast_url = _FORECAST_URL_CACHE.get(cache_key)
 
         if not forecast_url:
-            print("Error: Could not find forecast URL in the API response.")
-            return None
+            points_url = (
+                f"https://api.weather.gov/points/{latitude},{longitude}"
+            )
+            points_response = _SESSION.get(points_url, timeout=10)
+            points_response.raise_for_status()
+            points_data = orjson.loads(points_response.content)
+            forecast_url = points_data.get('properties', {}).get('forecast')
 
-        forecast_response = requests.get(
-            forecast_url, headers=headers, timeout=10
-        )
+            if not forecast_url:
+                logger.warning(
+                    "Error: Could not find forecast URL in the API response."
+                )
+                return None
+
+            with _FORECAST_URL_CACHE_LOCK:
+                _FORECAST_URL_CACHE[cache_key] = forecast_url
+
+        forecast_response = _SESSION.get(forecast_url, timeout=10)
         forecast_response.raise_for_status()
-        forecast_data = forecast_response.json()
+        forecast_data = orjson.loads(forecast_response.content)
 
         periods = forecast_data.get('properties', {}).get('periods')
         return periods
 
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred with the network request: {e}")
+    except httpx.HTTPError as e:
+        logger.warning(f"An error occurred with the network request: {e}")
         return None
-    except (KeyError, IndexError) as e:
-        print(f"Error parsing the NWS API response: {e}")
+    except (KeyError, IndexError, ValueError) as e:
+        logger.warning(f"Error parsing the NWS API response: {e}")
         return None
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        logger.error(f"An unexpected error occurred: {e}")
         return None
 
 
@@ -116,12 +193,187 @@ def get_weather(address: str) -> Optional[List[Dict[str, Any]]]:
         A list of dictionaries, where each dictionary represents a forecast
         period (e.g., 'Tonight', 'Thursday'). Returns None if an error occurs.
     """
+    coords = get_lat_lon_from_address(address=address, api_key=GOOGLE_MAP_KEY)
+    if coords is None:
+        logger.warning(f"Could not geocode address: {address}")
+        return None
+
+    return get_weather_forecast(coords[0], coords[1])
+
+
+async def get_lat_lon_from_address_async(
+    address: str, api_key: str, session: httpx.AsyncClient
+) -> Optional[Tuple[float, float]]:
+    """Async variant of get_lat_lon_from_address.
+
+    Args:
+        address: The street address or place name to geocode.
+        api_key: Your Google Maps Platform API key.
+        session: The async HTTP client used for the request.
+
+    Returns:
+        A tuple containing the latitude and longitude (lat, lon), or None if
+        the address could not be geocoded.
+    """
+    cache_key = (address.strip().lower(), api_key)
+    with _GEOCODE_CACHE_LOCK:
+        if cache_key in _GEOCODE_CACHE:
+            return _GEOCODE_CACHE[cache_key]
+
+    base_url = "https://maps.googleapis.com/maps/api/geocode/json"
+    params = {
+        'address': address,
+        'key': api_key
+    }
     try:
-        lat, lon = get_lat_lon_from_address(
-            address=address, api_key=GOOGLE_MAP_KEY
-        )
-        forecast = get_weather_forecast(lat, lon)
-        return forecast
+        response = await session.get(base_url, params=params)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+
+        if data['status'] == 'OK':
+            location = data['results'][0]['geometry']['location']
+            coords = (location['lat'], location['lng'])
+            with _GEOCODE_CACHE_LOCK:
+                _GEOCODE_CACHE[cache_key] = coords
+            return coords
+        else:
+            error_message = data.get('error_message', '')
+            logger.warning(
+                f"Geocoding API Error: {data.get('status')} - {error_message}"
+            )
+            return None
+
+    except httpx.HTTPError as e:
+        logger.warning(f"An error occurred with the network request: {e}")
+        return None
+    except (KeyError, IndexError, ValueError) as e:
+        logger.warning(f"Error parsing the Geocoding API response: {e}")
+        return None
+
+
+async def get_weather_forecast_async(
+    latitude: float, longitude: float, session: httpx.AsyncClient
+) -> Optional[List[Dict[str, Any]]]:
+    """Async variant of get_weather_forecast.
+
+    Args:
+        latitude: The latitude of the location (e.g., 38.8977).
+        longitude: The longitude of the location (e.g., -77.0365).
+        session: The async HTTP client used for the requests.
+
+    Returns:
+        A list of dictionaries, where each dictionary represents a forecast
+        period (e.g., 'Tonight', 'Thursday'). Returns None if an error
+        occurs or the data cannot be fetched.
+    """
+    cache_key = (round(latitude, 2), round(longitude, 2))
+
+    try:
+        with _FORECAST_URL_CACHE_LOCK:
+            forecast_url = _FORECAST_URL_CACHE.get(cache_key)
+
+        if not forecast_url:
+            points_url = (
+                f"https://api.weather.gov/points/{latitude},{longitude}"
+            )
+            points_response = await session.get(points_url)
+            points_response.raise_for_status()
+            points_data = orjson.loads(points_response.content)
+            forecast_url = points_data.get('properties', {}).get('forecast')
+
+            if not forecast_url:
+                logger.warning(
+                    "Error: Could not find forecast URL in the API response."
+                )
+                return None
+
+            with _FORECAST_URL_CACHE_LOCK:
+                _FORECAST_URL_CACHE[cache_key] = forecast_url
+
+        forecast_response = await session.get(forecast_url)
+        forecast_response.raise_for_status()
+        forecast_data = orjson.loads(forecast_response.content)
+
+        periods = forecast_data.get('properties', {}).get('periods')
+        return periods
+
+    except httpx.HTTPError as e:
+        logger.warning(f"An error occurred with the network request: {e}")
+        return None
+    except (KeyError, IndexError, ValueError) as e:
+        logger.warning(f"Error parsing the NWS API response: {e}")
+        return None
     except Exception as e:
-        print(f"Something broke. Good luck fixing:\n{e}")
+        logger.error(f"An unexpected error occurred: {e}")
         return None
+
+
+async def _get_weather_async(
+    address: str, session: httpx.AsyncClient
+) -> Optional[List[Dict[str, Any]]]:
+    """Geocodes an address and fetches its forecast on a shared session.
+
+    Args:
+        address: The street address or place name to geocode.
+        session: The async HTTP client used for the requests.
+
+    Returns:
+        A list of forecast period dictionaries, or None if an error occurs.
+    """
+    coords = await get_lat_lon_from_address_async(
+        address=address, api_key=GOOGLE_MAP_KEY, session=session
+    )
+    if coords is None:
+        return None
+    return await get_weather_forecast_async(coords[0], coords[1], session)
+
+
+async def get_weather_batch_async(
+    addresses: List[str],
+) -> List[Optional[List[Dict[str, Any]]]]:
+    """Fetches weather forecasts for several addresses concurrently.
+
+    Geocoding and the two-hop NWS lookup for each address run as
+    overlapping tasks on one shared session, so N addresses cost roughly
+    one round-trip of wall time instead of N. Await this directly from
+    async contexts such as the agent runtime.
+
+    Args:
+        addresses: Street addresses or place names to look up.
+
+    Returns:
+        A list of forecasts in the same order as the input addresses, with
+        None entries for addresses that could not be resolved.
+    """
+    async with _build_async_client() as session:
+        return await asyncio.gather(
+            *[_get_weather_async(address, session)
+              for address in addresses]
+        )
+
+
+def get_weather_batch(
+    addresses: List[str],
+) -> List[Optional[List[Dict[str, Any]]]]:
+    """Synchronous wrapper around get_weather_batch_async.
+
+    asyncio.run cannot be called while a loop is already running, which
+    is the normal state in notebook cells and the agent runtime, so in
+    that case the coroutine runs on its own thread with its own loop.
+
+    Args:
+        addresses: Street addresses or place names to look up.
+
+    Returns:
+        A list of forecasts in the same order as the input addresses, with
+        None entries for addresses that could not be resolved.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(get_weather_batch_async(addresses))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(
+            asyncio.run, get_weather_batch_async(addresses)
+        ).result()
@@ -0,0 +1,53 @@
+import httpx
+
+
+def _build_client() -> httpx.Client:
+    """Creates a shared HTTP/2 client with connection pooling and retries.
+
+    Both the geocoding and weather APIs speak HTTP/2, so one multiplexed
+    TLS connection per host carries concurrent requests without the
+    per-connection handshake cost or head-of-line blocking of parallel
+    HTTP/1.1 connections.
+
+    Returns:
+        A configured httpx.Client instance.
+    """
+    return httpx.Client(
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(
+                max_keepalive_connections=32, max_connections=64
+            ),
+        ),
+        timeout=10.0,
+        # The NWS points endpoint 301-redirects coordinates with more
+        # than 4 decimal places, and httpx does not follow redirects by
+        # default the way requests did.
+        follow_redirects=True,
+        headers={'User-Agent': 'MyWeatherApp/1.0 (contact@example.com)'},
+    )
+
+
+def build_async_client() -> httpx.AsyncClient:
+    """Creates an HTTP/2 client for use with asyncio batching.
+
+    Returns:
+        A configured httpx.AsyncClient instance.
+    """
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(
+                max_keepalive_connections=32, max_connections=64
+            ),
+        ),
+        timeout=10.0,
+        follow_redirects=True,
+        headers={'User-Agent': 'MyWeatherApp/1.0 (contact@example.com)'},
+    )
+
+
+# One connection pool per process, shared by every challenge module.
+SESSION = _build_client()
@@ -0,0 +1,46 @@
+import os
+import vertexai
+from typing import Optional
+from functools import lru_cache
+from vertexai.generative_models import GenerationConfig, GenerativeModel
+
+# Moderation is a trivial yes/no classification, so it runs on the
+# cheaper flash-lite tier; the agent itself keeps the larger model.
+MODERATION_MODEL = os.getenv("MODERATION_MODEL", "gemini-2.5-flash-lite")
+
+# A yes/no verdict is decided by the first token, so cap decoding there
+# instead of paying for trailing tokens the caller throws away.
+YES_NO_CONFIG = GenerationConfig(
+    max_output_tokens=2,
+    temperature=0.0,
+    top_k=1,
+    stop_sequences=["\n"],
+)
+
+
+@lru_cache(maxsize=8)
+def get_moderation_model(
+    project_id: str,
+    location: str,
+    model_name: str = MODERATION_MODEL,
+    system_instruction: Optional[str] = None,
+) -> GenerativeModel:
+    """Returns a cached GenerativeModel for moderation checks.
+
+    vertexai.init rebuilds credentials and endpoints, and GenerativeModel
+    redoes client setup, so both are done once per (project, location,
+    model, instruction) combination instead of on every call. Sharing the
+    getter across challenges means one model client per process.
+
+    Args:
+        project_id: The Google Cloud project ID.
+        location: The Google Cloud location (e.g., "us-central1").
+        model_name: The Gemini model to use for moderation.
+        system_instruction: Optional fixed instruction prefix baked into
+            the model so per-call content is only the user query.
+
+    Returns:
+        A ready-to-use GenerativeModel instance.
+    """
+    vertexai.init(project=project_id, location=location)
+    return GenerativeModel(model_name, system_instruction=system_instruction)